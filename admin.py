@@ -0,0 +1,22 @@
+"""
+Admin Endpoint Helpers
+Access control shared by the admin endpoints
+"""
+
+import hmac
+from flask import abort, request
+from config import Config
+
+def is_admin_request() -> bool:
+    """True if a token is configured and the request carries it in X-Admin-Token."""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+def check_admin_token():
+    """
+    Hide admin endpoints unless the request carries Config.ADMIN_TOKEN.
+
+    Without a configured token every admin endpoint answers 404.
+    """
+    if not is_admin_request():
+        abort(404)
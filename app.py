@@ -1,22 +1,40 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template
+from flask import Flask, Response, request, jsonify, send_from_directory, render_template, stream_with_context
 import os
 from config import Config
+from audio_store import audio_store, iter_chunks
+from live_feed import LiveFeedHub
+from admin import check_admin_token
+from profiling import init_profiling
+from prompts import token_usage
 from utils import (
     generate_commentary, 
+    generate_multilingual_commentary,
     text_to_speech, 
+    text_to_speech_many,
     cleanup_old_audio_files,
     get_team_name,
+    validate_team_id,
+    validate_commentator,
+    validate_language,
     ValidationError,
     logger
 )
 
-app = Flask(__name__)
+# The built-in static endpoint would shadow static_files, which also serves in-memory audio
+app = Flask(__name__, static_folder=None)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 app.config['STATIC_FOLDER'] = Config.STATIC_FOLDER
 
 # Create static folder if it doesn't exist
 os.makedirs(app.config['STATIC_FOLDER'], exist_ok=True)
 
+# Opt-in request profiling, see profiling.py
+if Config.PROFILING_ENABLED:
+    init_profiling(app)
+
+# Shared poller for live team feeds
+live_hub = LiveFeedHub()
+
 # ===== HELPER FUNCTIONS =====
 def cleanup_audio_files():
     """Clean up old audio files periodically."""
@@ -25,6 +43,68 @@ def cleanup_audio_files():
     except Exception as e:
         logger.error(f"Error during audio cleanup: {e}")
 
+def audio_response(data: bytes) -> Response:
+    """Serve in-memory audio, honouring single byte range requests."""
+    length = len(data)
+    start, stop = 0, length
+    status = 200
+
+    if request.range is not None:
+        byte_range = request.range.range_for_length(length)
+        if byte_range is not None:
+            start, stop = byte_range
+            status = 206
+        elif len(request.range.ranges) == 1:
+            response = Response(status=416)
+            response.headers["Content-Range"] = f"bytes */{length}"
+            return response
+
+    response = Response(
+        iter_chunks(data, start, stop),
+        status=status,
+        mimetype="audio/mpeg",
+        direct_passthrough=True
+    )
+    response.headers["Content-Length"] = str(stop - start)
+    response.headers["Accept-Ranges"] = "bytes"
+    if status == 206:
+        response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{length}"
+    return response
+
+def multilingual_commentary(team_id, commentator, languages, duration=None):
+    """
+    Generates commentary and audio for several languages in one response.
+    
+    Scores are fetched once, all languages come from a single LLM completion
+    and the audio for each language is synthesized in parallel.
+    """
+    if not isinstance(languages, list) or not all(isinstance(lang, str) for lang in languages):
+        return jsonify({"error": "Languages must be a list of language names"}), 400
+
+    # Preserve the requested order while dropping duplicates
+    languages = list(dict.fromkeys(languages))
+
+    logger.info(f"Generating commentary for team {team_id} with {commentator} in {', '.join(languages)}")
+
+    texts = generate_multilingual_commentary(team_id, commentator, languages, duration)
+    audio_files = text_to_speech_many(texts)
+
+    if not any(audio_files.values()):
+        return jsonify({"error": "Failed to generate audio file"}), 500
+
+    cleanup_audio_files()
+
+    return jsonify({
+        "team_name": get_team_name(team_id),
+        "variants": {
+            language: {
+                "text": texts[language],
+                "audio": "/" + audio_files[language] if audio_files[language] else None
+            }
+            for language in languages
+        }
+    })
+
 # ===== ROUTES =====
 @app.route("/")
 def index():
@@ -44,15 +124,20 @@ def commentary():
         team_id = req.get("team_id")
         commentator = req.get("commentator", "Ravi Shastri")
         language = req.get("language", "English")
+        languages = req.get("languages")
+        duration = req.get("duration")
 
         # Validate inputs
         if not team_id:
             return jsonify({"error": "Team ID is required"}), 400
 
+        if languages is not None:
+            return multilingual_commentary(team_id, commentator, languages, duration)
+
         logger.info(f"Generating commentary for team {team_id} with {commentator} in {language}")
         
         # Generate commentary
-        text = generate_commentary(team_id, commentator, language)
+        text = generate_commentary(team_id, commentator, language, duration)
         
         # Convert to speech
         audio_file = text_to_speech(text, language)
@@ -76,9 +161,52 @@ def commentary():
         logger.error(f"Error generating commentary: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route("/teams/<team_id>/live")
+def team_live(team_id):
+    """
+    Live commentary feed for a team.
+    
+    Streams server-sent events by default. With `mode=poll` it long-polls instead,
+    returning the first update newer than `since` or 204 if none arrived in time.
+    """
+    commentator = request.args.get("commentator", "Ravi Shastri")
+    language = request.args.get("language", "English")
+
+    if not validate_team_id(team_id):
+        return jsonify({"error": "Invalid team ID"}), 400
+    if not validate_commentator(commentator):
+        return jsonify({"error": "Invalid commentator"}), 400
+    if not validate_language(language):
+        return jsonify({"error": "Invalid language"}), 400
+
+    if request.args.get("mode") == "poll":
+        since = request.args.get("since", 0, type=int)
+        event = live_hub.wait_for_update(team_id, commentator, language, since)
+        if event is None:
+            return "", 204
+        return jsonify(event)
+
+    return Response(
+        stream_with_context(live_hub.stream(team_id, commentator, language)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/admin/token-usage")
+def admin_token_usage():
+    """Recent Groq token usage per request, for tuning length against latency."""
+    check_admin_token()
+    return jsonify({
+        "summary": token_usage.summary(),
+        "requests": token_usage.recent()
+    })
+
 @app.route("/static/<path:filename>")
 def static_files(filename):
-    """Serves static files like audio."""
+    """Serves static files like audio, preferring the in-memory audio store."""
+    data = audio_store.get(filename)
+    if data is not None:
+        return audio_response(data)
     return send_from_directory(app.config['STATIC_FOLDER'], filename)
 
 @app.errorhandler(404)
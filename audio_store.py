@@ -0,0 +1,115 @@
+"""
+In-Memory Audio Store
+Keeps generated MP3s in memory under a byte budget, falling back to disk when full
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterator, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class AudioStore:
+    """Thread-safe LRU store of audio bytes bounded by a total byte budget."""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = Config.AUDIO_STORE_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+
+    def put(self, name: str, data: bytes) -> bool:
+        """
+        Store audio under `name`, evicting least recently used entries to make room.
+
+        Returns:
+            bool: False if the audio alone exceeds the budget and was not stored
+        """
+        if len(data) > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            while self._entries and self._size + len(data) > self.max_bytes:
+                evicted_name, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                logger.info(f"Evicted in-memory audio: {evicted_name}")
+
+            self._entries[name] = data
+            self._size += len(data)
+        return True
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Return the stored audio and mark it as recently used, or None."""
+        with self._lock:
+            data = self._entries.get(name)
+            if data is not None:
+                self._entries.move_to_end(name)
+            return data
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total bytes currently held."""
+        with self._lock:
+            return self._size
+
+# Shared store used by utils and voice_utils
+audio_store = AudioStore()
+
+def new_audio_filename() -> str:
+    """Generate a filename for a new commentary MP3."""
+    timestamp = int(time.time() * 1000)
+    return f"commentary_{timestamp}_{uuid.uuid4().hex[:8]}.mp3"
+
+def save_audio(data: bytes, filename: Optional[str] = None) -> str:
+    """
+    Save generated audio in memory when enabled, otherwise on disk.
+
+    Args:
+        data: The audio bytes
+        filename: Name to save under, generated if omitted
+
+    Returns:
+        str: Path of the audio relative to the app root, e.g. static/commentary_1.mp3
+    """
+    filename = filename or new_audio_filename()
+    path = f"{Config.STATIC_FOLDER}/{filename}"
+
+    if Config.AUDIO_STORE_ENABLED and audio_store.put(filename, data):
+        logger.info(f"Audio stored in memory: {filename}")
+        return path
+
+    os.makedirs(Config.STATIC_FOLDER, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    logger.info(f"Audio file saved: {path}")
+    return path
+
+def iter_chunks(data: bytes, start: int = 0, stop: Optional[int] = None,
+                chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Yield `data[start:stop]` in chunks of at most `chunk_size` bytes.
+
+    Slicing goes through a memoryview so only one chunk is copied at a time;
+    WSGI servers require each chunk to be bytes.
+    """
+    view = memoryview(data)
+    stop = len(data) if stop is None else stop
+    for offset in range(start, stop, chunk_size):
+        yield bytes(view[offset:min(offset + chunk_size, stop)])
@@ -19,10 +19,60 @@ class Config:
     # API Configuration
     SPORTS_API_BASE_URL = "https://www.thesportsdb.com/api/v1/json"
     GROQ_MODEL = "llama3-8b-8192"
+    GROQ_TEMPERATURE = 0.8
+    GROQ_TIMEOUT = 20  # seconds per completion attempt
+    GROQ_MAX_RETRIES = 1  # the SDK also retries read timeouts, which re-sends a billed completion
+    
+    # Upstream Client Configuration
+    UPSTREAM_TIMEOUT = 5  # seconds per attempt
+    UPSTREAM_TOTAL_TIMEOUT = 12  # seconds across all attempts of one request, including backoff
+    UPSTREAM_MAX_RETRIES = 3
+    UPSTREAM_BACKOFF_BASE = 0.5  # seconds, doubled on each retry
+    UPSTREAM_BACKOFF_MAX = 8
+    UPSTREAM_POOL_SIZE = 10  # connections kept per host
+    UPSTREAM_NEGATIVE_CACHE_TTL = 30  # seconds to skip a team after a failed or empty fetch
+    SCORES_FRESH_TTL = 30  # seconds cached scores are served without asking the upstream
+    SCORES_STALE_TTL = 600  # until then, older scores are served while refreshing in the background
+    SCORES_REFRESH_WORKERS = 4
+    TTS_TIMEOUT = 60  # seconds for a paid speech synthesis request
+    
+    # Prompt Budget Configuration
+    MAX_PROMPT_TOKENS = 1500
+    MIN_COMPLETION_TOKENS = 64
+    MAX_COMPLETION_TOKENS = 2048
+    COMPLETION_TOKEN_HEADROOM = 0.25  # extra room so the model can finish its last sentence
+    TARGET_AUDIO_SECONDS = int(os.getenv('TARGET_AUDIO_SECONDS', '60'))
+    MIN_TARGET_AUDIO_SECONDS = 10
+    MAX_TARGET_AUDIO_SECONDS = 180
+    SPEECH_WORDS_PER_SECOND = 2.5  # typical gTTS speaking rate
+    
+    # Approximate tokens per word for each language
+    LANGUAGE_TOKENS_PER_WORD = {
+        "English": 1.3,
+        "Hindi": 3.0,
+        "Spanish": 1.6
+    }
     
     # Audio Configuration
     AUDIO_CACHE_DURATION = 3600  # 1 hour in seconds
     MAX_AUDIO_FILES = 10
+    AUDIO_STORE_ENABLED = os.getenv('AUDIO_STORE_ENABLED', 'False').lower() == 'true'
+    AUDIO_STORE_MAX_BYTES = int(os.getenv('AUDIO_STORE_MAX_BYTES', str(32 * 1024 * 1024)))
+    
+    # Live Feed Configuration
+    LIVE_POLL_INTERVAL = int(os.getenv('LIVE_POLL_INTERVAL', '60'))  # seconds between upstream polls
+    LIVE_KEEPALIVE_INTERVAL = 15  # seconds between SSE keepalive comments
+    LIVE_LONG_POLL_TIMEOUT = 30  # seconds a long-poll request waits for news
+    LIVE_SUBSCRIBER_QUEUE_SIZE = 10  # pending events kept per subscriber
+    LIVE_IDLE_GRACE_PERIOD = 300  # seconds cached events outlive their last subscriber
+    
+    # Profiling Configuration
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILE_SLOW_REQUEST_MS = int(os.getenv('PROFILE_SLOW_REQUEST_MS', '2000'))  # 0 disables slow-request capture
+    PROFILE_SLOW_REQUEST_ENDPOINTS = ["commentary"]  # endpoints whose slow requests are captured; the live feed waits by design
+    PROFILE_SAMPLE_INTERVAL_MS = 10
+    PROFILE_HISTORY_SIZE = 20
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')  # admin endpoints answer 404 while unset
     
     # Voice Settings for gTTS
     VOICE_SETTINGS = {
@@ -38,6 +88,22 @@ class Config:
         "Tony Romo"
     ]
     
+    # Commentator styles: prompt description and how wordy they are relative to the target length
+    COMMENTATOR_STYLES = {
+        "Ravi Shastri": {
+            "description": "the booming cricket voice known for punchy, larger-than-life one-liners",
+            "verbosity": 0.9
+        },
+        "Harsha Bhogle": {
+            "description": "the articulate storyteller who brings context and warmth to every moment",
+            "verbosity": 1.1
+        },
+        "Tony Romo": {
+            "description": "the energetic former quarterback who reads the play before it happens",
+            "verbosity": 1.0
+        }
+    }
+    
     # Sample Teams (Team ID: Team Name)
     SAMPLE_TEAMS = {
         "134860": "Boston Celtics",
@@ -0,0 +1,256 @@
+"""
+Live Team Feed
+Polls recent results once per subscribed team and fans commentary out to every watcher
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from config import Config
+from utils import (
+    refresh_recent_scores,
+    generate_commentary_from_games,
+    get_team_name,
+    logger
+)
+
+# (team_id, commentator, language)
+FeedKey = Tuple[str, str, str]
+
+class Subscription:
+    """A single watcher of a team feed."""
+
+    def __init__(self, team_id: str, commentator: str, language: str):
+        self.key: FeedKey = (team_id, commentator, language)
+        self.events: queue.Queue = queue.Queue(maxsize=Config.LIVE_SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: dict):
+        """Queue an event, dropping the oldest pending one if the watcher is lagging."""
+        while True:
+            try:
+                self.events.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def next_event(self, timeout: float) -> Optional[dict]:
+        """Wait up to `timeout` seconds for the next event."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class LiveFeedHub:
+    """
+    Shares one upstream poll and one commentary generation between all watchers.
+
+    Every subscribed team is polled once per `poll_interval`. When its results
+    change, commentary is generated once per (commentator, language) pair that
+    has watchers and the same event is delivered to each of them.
+    """
+
+    def __init__(self,
+                 fetch_scores: Callable[[str], List[str]] = refresh_recent_scores,
+                 commentate: Callable[..., str] = generate_commentary_from_games,
+                 poll_interval: Optional[float] = None,
+                 idle_grace: Optional[float] = None):
+        self._fetch_scores = fetch_scores
+        self._commentate = commentate
+        self.poll_interval = poll_interval or Config.LIVE_POLL_INTERVAL
+        self.idle_grace = Config.LIVE_IDLE_GRACE_PERIOD if idle_grace is None else idle_grace
+
+        self._lock = threading.Lock()
+        self._subscribers: Dict[FeedKey, List[Subscription]] = {}
+        self._latest: Dict[FeedKey, dict] = {}
+        self._games: Dict[str, List[str]] = {}
+        self._pending: Set[str] = set()
+        self._idle_since: Dict[FeedKey, float] = {}
+        self._version = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, team_id: str, commentator: str, language: str) -> Subscription:
+        """Register a watcher. The latest known event, if any, is delivered immediately."""
+        subscription = Subscription(team_id, commentator, language)
+
+        with self._lock:
+            self._subscribers.setdefault(subscription.key, []).append(subscription)
+            self._idle_since.pop(subscription.key, None)
+            latest = self._latest.get(subscription.key)
+            if latest is None:
+                self._pending.add(team_id)
+            self._ensure_poller()
+
+        if latest is not None:
+            subscription.deliver(latest)
+        else:
+            self._wake.set()
+
+        logger.info(f"Live subscriber added for team {team_id} ({commentator}, {language})")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a watcher.
+
+        Cached events outlive the last watcher for `idle_grace` seconds, so
+        long-poll clients reconnecting between polls cost nothing.
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers and self._subscribers.pop(subscription.key, None) is not None:
+                self._idle_since[subscription.key] = time.monotonic()
+
+    def subscriber_count(self, team_id: Optional[str] = None) -> int:
+        """Number of active watchers, optionally for a single team."""
+        with self._lock:
+            return sum(len(subs) for key, subs in self._subscribers.items()
+                       if team_id is None or key[0] == team_id)
+
+    def poll_once(self, team_ids: Optional[Set[str]] = None, use_cached: bool = False):
+        """
+        Poll each subscribed team once and publish changed results.
+
+        Args:
+            team_ids: Teams to poll, defaults to every subscribed team
+            use_cached: Reuse the last fetched games when available instead of
+                hitting the upstream API (used when a new watcher joins)
+        """
+        with self._lock:
+            self._prune_idle()
+            subscribed = {key[0] for key in self._subscribers}
+            teams = subscribed if team_ids is None else subscribed & set(team_ids)
+
+        for team_id in teams:
+            games = self._games.get(team_id) if use_cached else None
+            if games is None:
+                games = self._fetch_scores(team_id)
+                if not games:
+                    logger.warning(f"Live poll returned no games for team {team_id}")
+                    continue
+                with self._lock:
+                    self._games[team_id] = games
+            self._publish(team_id, games)
+
+    def wait_for_update(self, team_id: str, commentator: str, language: str,
+                        since: int = 0, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Long-poll helper: wait for an event newer than `since`.
+
+        Returns:
+            Optional[dict]: The event, or None if nothing newer arrived in time
+        """
+        timeout = Config.LIVE_LONG_POLL_TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        subscription = self.subscribe(team_id, commentator, language)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                event = subscription.next_event(remaining)
+                if event is None:
+                    return None
+                if event["version"] > since:
+                    return event
+        finally:
+            self.unsubscribe(subscription)
+
+    def stream(self, team_id: str, commentator: str, language: str) -> Iterator[str]:
+        """Server-sent events stream for a single watcher."""
+        subscription = self.subscribe(team_id, commentator, language)
+        try:
+            while True:
+                event = subscription.next_event(Config.LIVE_KEEPALIVE_INTERVAL)
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield format_sse(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _publish(self, team_id: str, games: List[str]):
+        """Generate commentary once per stale (commentator, language) pair and fan it out."""
+        with self._lock:
+            stale = [key for key in self._subscribers
+                     if key[0] == team_id and self._latest.get(key, {}).get("games") != games]
+
+        for key in stale:
+            _, commentator, language = key
+            text = self._commentate(games, commentator, language, team_id)
+
+            with self._lock:
+                self._version += 1
+                event = {
+                    "version": self._version,
+                    "team_id": team_id,
+                    "team_name": get_team_name(team_id),
+                    "commentator": commentator,
+                    "language": language,
+                    "games": games,
+                    "text": text,
+                    "updated_at": time.time()
+                }
+                self._latest[key] = event
+                if key not in self._subscribers:
+                    # Every watcher left while the commentary was generated
+                    self._idle_since.setdefault(key, time.monotonic())
+                subscribers = list(self._subscribers.get(key, []))
+
+            for subscription in subscribers:
+                subscription.deliver(event)
+            logger.info(f"Published live update {event['version']} for team {team_id} "
+                        f"to {len(subscribers)} subscribers")
+
+    def _prune_idle(self):
+        """Forget cached events and games nobody has watched for `idle_grace` seconds. Caller must hold the lock."""
+        cutoff = time.monotonic() - self.idle_grace
+        expired = [key for key, since in self._idle_since.items() if since <= cutoff]
+        for key in expired:
+            del self._idle_since[key]
+            self._latest.pop(key, None)
+
+        watched = {key[0] for key in self._subscribers} | {key[0] for key in self._idle_since}
+        for team_id in [team_id for team_id in self._games if team_id not in watched]:
+            del self._games[team_id]
+
+    def cached_keys(self) -> Set[FeedKey]:
+        """Feeds that still hold a cached event."""
+        with self._lock:
+            return set(self._latest)
+
+    def _ensure_poller(self):
+        """Start the shared polling thread. Caller must hold the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="live-feed-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Poll all teams on the shared schedule, serving new watchers in between."""
+        next_poll = time.monotonic()
+        while True:
+            self._wake.wait(timeout=max(0.0, next_poll - time.monotonic()))
+            self._wake.clear()
+
+            with self._lock:
+                pending, self._pending = self._pending, set()
+
+            try:
+                if time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + self.poll_interval
+                    self.poll_once()
+                elif pending:
+                    self.poll_once(pending, use_cached=True)
+            except Exception as e:
+                logger.error(f"Error during live feed poll: {e}")
+
+def format_sse(event: dict) -> str:
+    """Format an event as a server-sent events message."""
+    return f"id: {event['version']}\nevent: commentary\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,211 @@
+"""
+Request Profiling
+On-demand cProfile runs and stack-sampled capture of slow requests
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Dict, List, Optional
+from flask import Flask, Response, abort, g, jsonify, request
+from admin import check_admin_token, is_admin_request
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ProfileStore:
+    """Keeps the most recent profiles in memory."""
+
+    def __init__(self, max_profiles: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._profiles: deque = deque(maxlen=max_profiles or Config.PROFILE_HISTORY_SIZE)
+
+    def add(self, kind: str, duration_ms: float, report: str) -> str:
+        """Store a profile of the current request and return its ID."""
+        profile_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._profiles.append({
+                "id": profile_id,
+                "kind": kind,
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "duration_ms": round(duration_ms, 1),
+                "created_at": time.time(),
+                "report": report
+            })
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def summaries(self) -> List[dict]:
+        """All stored profiles, newest first, without their reports."""
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "report"} for p in reversed(self._profiles)]
+
+class StackSampler:
+    """
+    Samples the stacks of registered request threads from a single background thread.
+
+    Stacks are counted in collapsed form ("outer;inner;leaf"), which can be fed
+    straight into flame graph tools.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self._lock = threading.Lock()
+        self._active: Dict[int, Counter] = {}
+        self._has_active = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int):
+        """Begin sampling a thread."""
+        with self._lock:
+            self._active[thread_id] = Counter()
+            self._has_active.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, thread_id: int) -> Counter:
+        """Stop sampling a thread and return its stack counts."""
+        with self._lock:
+            samples = self._active.pop(thread_id, Counter())
+            if not self._active:
+                self._has_active.clear()
+        return samples
+
+    def sample_once(self):
+        """Record the current stack of every registered thread."""
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, samples in self._active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[collapse_stack(frame)] += 1
+
+    def _run(self):
+        while True:
+            self._has_active.wait()
+            self.sample_once()
+            time.sleep(self.interval)
+
+def collapse_stack(frame) -> str:
+    """Render a frame and its callers as "file:function;..." from outermost to innermost."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+def format_samples(samples: Counter, interval_ms: float, limit: int = 50) -> str:
+    """Format stack counts as collapsed stacks, heaviest first."""
+    lines = [f"# {sum(samples.values())} samples every {interval_ms:g} ms"]
+    lines.extend(f"{stack} {count}" for stack, count in samples.most_common(limit))
+    return "\n".join(lines)
+
+def format_cprofile(profiler: cProfile.Profile, limit: int = 50) -> str:
+    """Format cProfile stats sorted by cumulative time."""
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+def profiling_requested() -> bool:
+    """
+    True if an admin request asks to be profiled via header or query flag.
+
+    cProfile is expensive, so the flag is ignored unless the request also
+    carries the admin token; other requests are handled normally.
+    """
+    flag = request.headers.get("X-Profile") or request.args.get("profile")
+    return bool(flag) and flag.lower() in ("1", "true", "yes") and is_admin_request()
+
+def slow_request_capture_applies() -> bool:
+    """True if the request's endpoint is one whose slow requests are worth sampling."""
+    return request.endpoint in Config.PROFILE_SLOW_REQUEST_ENDPOINTS
+
+def init_profiling(app: Flask):
+    """
+    Register profiling hooks and admin endpoints on the app.
+
+    Only call this when Config.PROFILING_ENABLED is set; when it is not called
+    requests carry no profiling overhead at all.
+    """
+    store = ProfileStore()
+    sampler = StackSampler() if Config.PROFILE_SLOW_REQUEST_MS > 0 else None
+
+    @app.before_request
+    def start_profiling():
+        g.profile_started = time.perf_counter()
+
+        if profiling_requested():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g.profiler = profiler
+            except ValueError as e:
+                # Another profiler is already active (Python 3.12+ allows only one)
+                logger.warning(f"Could not start profiler: {e}")
+        elif sampler is not None and slow_request_capture_applies():
+            sampler.start(threading.get_ident())
+            g.sampling = True
+
+    @app.after_request
+    def finish_profiling(response):
+        started = g.pop("profile_started", None)
+        if started is None:
+            return response
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profile_id = store.add("cprofile", duration_ms, format_cprofile(profiler))
+            response.headers["X-Profile-Id"] = profile_id
+            logger.info(f"Stored profile {profile_id} for {request.path} ({duration_ms:.0f} ms)")
+
+        if g.pop("sampling", False):
+            samples = sampler.stop(threading.get_ident())
+            if duration_ms >= Config.PROFILE_SLOW_REQUEST_MS and samples:
+                report = format_samples(samples, sampler.interval * 1000)
+                profile_id = store.add("sampled", duration_ms, report)
+                response.headers["X-Profile-Id"] = profile_id
+                logger.warning(f"Slow request {request.path} took {duration_ms:.0f} ms, "
+                               f"stored profile {profile_id}")
+
+        return response
+
+    @app.teardown_request
+    def cleanup_profiling(error=None):
+        # after_request is skipped when a view raises; make sure nothing keeps running
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+        if g.pop("sampling", False):
+            sampler.stop(threading.get_ident())
+
+    @app.route("/admin/profiles")
+    def list_profiles():
+        """Lists stored profiles, newest first."""
+        check_admin_token()
+        return jsonify({"profiles": store.summaries()})
+
+    @app.route("/admin/profiles/<profile_id>")
+    def show_profile(profile_id):
+        """Shows a stored profile report as plain text."""
+        check_admin_token()
+        profile = store.get(profile_id)
+        if profile is None:
+            abort(404)
+        return Response(profile["report"], mimetype="text/plain")
+
+    logger.info("Request profiling enabled")
@@ -0,0 +1,176 @@
+"""
+Commentary Prompt Builder
+Builds LLM prompts within a token budget and sizes the completion to the target audio length
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+from config import Config
+
+class CommentaryPrompt(NamedTuple):
+    """A prompt together with the budget it was built for, after fitting the completion limit."""
+    text: str
+    games: List[str]
+    target_seconds: int
+    target_words: int
+    max_tokens: int
+    estimated_prompt_tokens: int
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting.
+
+    Llama tokenizers average about four characters per token for English
+    prose, which is close enough to keep prompts inside their budget.
+    """
+    return math.ceil(len(text) / 4)
+
+def _words_per_second(commentator: str) -> float:
+    verbosity = Config.COMMENTATOR_STYLES.get(commentator, {}).get("verbosity", 1.0)
+    return Config.SPEECH_WORDS_PER_SECOND * verbosity
+
+def target_word_count(commentator: str, target_seconds: int) -> int:
+    """Words of commentary that fit the target audio duration in the commentator's style."""
+    return max(1, round(target_seconds * _words_per_second(commentator)))
+
+def _tokens_per_word(languages: List[str]) -> float:
+    """Completion tokens per word of commentary, summed over languages and including headroom."""
+    tokens = sum(Config.LANGUAGE_TOKENS_PER_WORD.get(language, 1.5) for language in languages)
+    return tokens * (1 + Config.COMPLETION_TOKEN_HEADROOM)
+
+def _structure_overhead(languages: List[str]) -> int:
+    """Tokens for the JSON wrapping when several languages are returned together."""
+    return 10 * len(languages) if len(languages) > 1 else 0
+
+def completion_tokens_needed(target_words: int, languages: List[str]) -> int:
+    """
+    Completion tokens needed for `target_words` in each language, before any cap.
+
+    Includes headroom so the model can finish its last sentence, plus a little
+    structure overhead per language when several are returned as JSON.
+    """
+    return math.ceil(target_words * _tokens_per_word(languages) + _structure_overhead(languages))
+
+def completion_token_budget(target_words: int, languages: List[str]) -> int:
+    """Completion tokens for `target_words` per language, clamped to the configured limits."""
+    tokens = completion_tokens_needed(target_words, languages)
+    return max(Config.MIN_COMPLETION_TOKENS, min(Config.MAX_COMPLETION_TOKENS, tokens))
+
+def max_words_within_budget(languages: List[str]) -> int:
+    """Most words per language whose completion fits Config.MAX_COMPLETION_TOKENS."""
+    available = Config.MAX_COMPLETION_TOKENS - _structure_overhead(languages)
+    return max(1, math.floor(available / _tokens_per_word(languages)))
+
+def _render(games: List[str], commentator: str, languages: List[str],
+            target_seconds: int, target_words: int) -> str:
+    description = Config.COMMENTATOR_STYLES.get(commentator, {}).get(
+        "description", "the renowned sports commentator")
+
+    if len(languages) == 1:
+        language_line = f"Please generate a unique, lively, and engaging commentary for each game in {languages[0]}."
+        length_line = (f"Keep the whole commentary to about {target_words} words, "
+                       f"roughly {target_seconds} seconds when read aloud.")
+    else:
+        language_line = ("Please generate a unique, lively, and engaging commentary for each game "
+                         f"in each of these languages: {', '.join(languages)}.")
+        length_line = (f"Keep the commentary in each language to about {target_words} words, "
+                       f"roughly {target_seconds} seconds when read aloud.")
+
+    prompt = f"""
+You are {commentator}, {description}.
+Here are the recent games:
+{chr(10).join(games)}
+
+{language_line}
+Avoid starting with "You are {commentator}".
+End each game commentary naturally, make it exciting.
+{length_line}
+"""
+    if len(languages) > 1:
+        quoted = ", ".join(f'"{language}"' for language in languages)
+        prompt += (f"Respond only with a JSON object whose keys are exactly [{quoted}] "
+                   "and whose values are the full commentary in that language.\n")
+    return prompt
+
+def build_commentary_prompt(games: List[str], commentator: str, languages: List[str],
+                            target_seconds: Optional[int] = None) -> CommentaryPrompt:
+    """
+    Build a commentary prompt that respects the input and output token budgets.
+
+    Older games are dropped until the prompt fits Config.MAX_PROMPT_TOKENS, and
+    the completion is capped at the tokens needed for the target audio duration.
+    When that exceeds Config.MAX_COMPLETION_TOKENS (long durations in several
+    languages), the requested length is shortened to fit rather than letting
+    the completion be cut off.
+
+    Args:
+        games: Game summaries, most relevant first
+        commentator: The commentator personality
+        languages: One or more languages for the commentary
+        target_seconds: Desired spoken length, defaults to Config.TARGET_AUDIO_SECONDS
+
+    Returns:
+        CommentaryPrompt: The prompt text and its budget
+    """
+    target_seconds = target_seconds or Config.TARGET_AUDIO_SECONDS
+    target_words = target_word_count(commentator, target_seconds)
+
+    word_limit = max_words_within_budget(languages)
+    if target_words > word_limit:
+        target_words = word_limit
+        target_seconds = max(1, round(target_words / _words_per_second(commentator)))
+
+    games = list(games)
+    text = _render(games, commentator, languages, target_seconds, target_words)
+    while len(games) > 1 and estimate_tokens(text) > Config.MAX_PROMPT_TOKENS:
+        games.pop()
+        text = _render(games, commentator, languages, target_seconds, target_words)
+
+    return CommentaryPrompt(
+        text=text,
+        games=games,
+        target_seconds=target_seconds,
+        target_words=target_words,
+        max_tokens=completion_token_budget(target_words, languages),
+        estimated_prompt_tokens=estimate_tokens(text)
+    )
+
+class TokenUsageLog:
+    """Recent per-request token usage, for tuning latency against verbosity."""
+
+    def __init__(self, max_entries: int = 200):
+        self._lock = threading.Lock()
+        self._entries: deque = deque(maxlen=max_entries)
+
+    def record(self, entry: Dict):
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self) -> List[Dict]:
+        """Recorded entries, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def summary(self) -> Dict:
+        """Averages over the recorded entries."""
+        entries = self.recent()
+        if not entries:
+            return {"requests": 0}
+
+        def average(key):
+            values = [e[key] for e in entries if e.get(key) is not None]
+            return round(sum(values) / len(values), 1) if values else None
+
+        return {
+            "requests": len(entries),
+            "avg_prompt_tokens": average("prompt_tokens"),
+            "avg_completion_tokens": average("completion_tokens"),
+            "avg_max_tokens": average("max_tokens"),
+            "avg_latency_ms": average("latency_ms"),
+            "truncated": sum(1 for e in entries if e.get("finish_reason") == "length")
+        }
+
+# Shared log of Groq token usage
+token_usage = TokenUsageLog()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the app routes.
+Run with: python test_app.py
+"""
+
+import sys
+import os
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+
+def post_commentary(body):
+    return app_module.app.test_client().post("/commentary", json=body)
+
+def test_multilingual_languages_validation():
+    """Test rejection of empty, invalid and malformed language lists."""
+    print("Testing multilingual language validation...")
+
+    base = {"team_id": "133602", "commentator": "Tony Romo"}
+
+    response = post_commentary({**base, "languages": []})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "At least one language is required"
+
+    response = post_commentary({**base, "languages": ["English", "French"]})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid language: French"
+
+    assert post_commentary({**base, "languages": "English"}).status_code == 400
+    assert post_commentary({**base, "languages": ["English", 3]}).status_code == 400
+
+    print("✅ Multilingual language validation tests passed!")
+
+def test_multilingual_languages_deduplicated():
+    """Test that duplicate languages are generated once, in request order."""
+    print("Testing multilingual deduplication...")
+
+    requested = []
+
+    def fake_generate(team_id, commentator, languages, duration=None):
+        requested.append(languages)
+        return {language: f"{language} commentary" for language in languages}
+
+    original_generate = app_module.generate_multilingual_commentary
+    original_tts = app_module.text_to_speech_many
+    app_module.generate_multilingual_commentary = fake_generate
+    app_module.text_to_speech_many = lambda texts: {
+        language: None if language == "Hindi" else f"static/{language}.mp3" for language in texts}
+    try:
+        response = post_commentary({"team_id": "133602", "commentator": "Tony Romo",
+                                    "languages": ["Spanish", "English", "Spanish", "Hindi"]})
+    finally:
+        app_module.generate_multilingual_commentary = original_generate
+        app_module.text_to_speech_many = original_tts
+
+    assert response.status_code == 200
+    assert requested == [["Spanish", "English", "Hindi"]]
+    variants = response.get_json()["variants"]
+    assert set(variants) == {"Spanish", "English", "Hindi"}
+    assert variants["English"] == {"text": "English commentary", "audio": "/static/English.mp3"}
+    assert variants["Hindi"]["audio"] is None
+
+    print("✅ Multilingual deduplication tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running App Route Tests...\n")
+
+    try:
+        test_multilingual_languages_validation()
+        test_multilingual_languages_deduplicated()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the audio_store module.
+Run with: python test_audio_store.py
+"""
+
+import sys
+import os
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_store import AudioStore, iter_chunks
+
+def test_lru_eviction():
+    """Test that the store stays within budget by evicting least recently used audio."""
+    print("Testing audio store LRU eviction...")
+
+    store = AudioStore(max_bytes=10)
+    assert store.put("a.mp3", b"aaaa") == True
+    assert store.put("b.mp3", b"bbbb") == True
+
+    # Touch a.mp3 so b.mp3 becomes the eviction candidate
+    assert store.get("a.mp3") == b"aaaa"
+    assert store.put("c.mp3", b"cccc") == True
+
+    assert "b.mp3" not in store
+    assert "a.mp3" in store
+    assert "c.mp3" in store
+    assert store.size == 8
+
+    # Replacing an entry does not double count it
+    assert store.put("c.mp3", b"cc") == True
+    assert store.size == 6
+
+    print("✅ Audio store LRU eviction tests passed!")
+
+def test_over_budget():
+    """Test that audio larger than the budget is rejected without evicting anything."""
+    print("Testing audio store budget...")
+
+    store = AudioStore(max_bytes=10)
+    store.put("a.mp3", b"aaaa")
+    assert store.put("big.mp3", b"x" * 11) == False
+    assert store.get("big.mp3") is None
+    assert len(store) == 1
+
+    print("✅ Audio store budget tests passed!")
+
+def test_iter_chunks():
+    """Test chunked slicing for range requests."""
+    print("Testing audio chunking...")
+
+    data = bytes(range(10))
+    chunks = list(iter_chunks(data, 2, 9, chunk_size=3))
+    assert [bytes(chunk) for chunk in chunks] == [bytes([2, 3, 4]), bytes([5, 6, 7]), bytes([8])]
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(iter_chunks(data)) == data
+
+    print("✅ Audio chunking tests passed!")
+
+def test_stored_audio_route():
+    """Test that /static serves stored audio, whole and by byte range."""
+    print("Testing stored audio route...")
+
+    from app import app
+    from audio_store import audio_store
+
+    data = bytes(range(256)) * 4
+    audio_store.put("commentary_test.mp3", data)
+    client = app.test_client()
+
+    response = client.get("/static/commentary_test.mp3")
+    assert response.status_code == 200
+    assert response.mimetype == "audio/mpeg"
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.get_data() == data
+
+    response = client.get("/static/commentary_test.mp3", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 100-199/{len(data)}"
+    assert response.headers["Content-Length"] == "100"
+    assert response.get_data() == data[100:200]
+
+    response = client.get("/static/commentary_test.mp3", headers={"Range": f"bytes={len(data)}-"})
+    assert response.status_code == 416
+
+    assert client.get("/static/commentary_missing.mp3").status_code == 404
+
+    print("✅ Stored audio route tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running Audio Store Tests...\n")
+
+    try:
+        test_lru_eviction()
+        test_over_budget()
+        test_iter_chunks()
+        test_stored_audio_route()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
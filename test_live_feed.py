@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the live_feed module.
+Run with: python test_live_feed.py
+"""
+
+import sys
+import os
+import time
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from live_feed import LiveFeedHub, format_sse
+
+class FakeUpstream:
+    """Counts upstream polls and commentary generations."""
+
+    def __init__(self):
+        self.games = ["Celtics vs Heat on 2024-05-01 - Score: 110:102"]
+        self.fetches = 0
+        self.generations = 0
+
+    def fetch_scores(self, team_id):
+        self.fetches += 1
+        return list(self.games)
+
+    def commentate(self, games, commentator, language, team_id=""):
+        self.generations += 1
+        return f"{commentator} in {language}: {games[0]}"
+
+def test_fan_out_shares_poll_and_generation():
+    """Test that many watchers of one team cost one poll and one generation."""
+    print("Testing live feed fan-out...")
+
+    upstream = FakeUpstream()
+    hub = LiveFeedHub(upstream.fetch_scores, upstream.commentate, poll_interval=3600)
+    hub._ensure_poller = lambda: None  # drive polling by hand
+
+    watchers = [hub.subscribe("134860", "Tony Romo", "English") for _ in range(5)]
+    hub.poll_once()
+
+    assert upstream.fetches == 1
+    assert upstream.generations == 1
+    events = [watcher.next_event(0) for watcher in watchers]
+    assert all(event["version"] == 1 for event in events)
+    assert events[0]["text"] == "Tony Romo in English: " + upstream.games[0]
+
+    # Unchanged results publish nothing
+    hub.poll_once()
+    assert upstream.fetches == 2
+    assert upstream.generations == 1
+    assert watchers[0].next_event(0) is None
+
+    # Changed results are generated once and delivered to everyone
+    upstream.games = ["Celtics vs Knicks on 2024-05-03 - Score: 99:97"]
+    hub.poll_once()
+    assert upstream.generations == 2
+    assert all(watcher.next_event(0)["version"] == 2 for watcher in watchers)
+
+    # A late watcher receives the latest event straight away
+    late = hub.subscribe("134860", "Tony Romo", "English")
+    assert late.next_event(0)["version"] == 2
+
+    for watcher in watchers + [late]:
+        hub.unsubscribe(watcher)
+    assert hub.subscriber_count() == 0
+
+    print("✅ Live feed fan-out tests passed!")
+
+def test_new_language_reuses_cached_games():
+    """Test that a new language for a polled team does not re-poll upstream."""
+    print("Testing live feed cached games...")
+
+    upstream = FakeUpstream()
+    hub = LiveFeedHub(upstream.fetch_scores, upstream.commentate, poll_interval=3600)
+    hub._ensure_poller = lambda: None
+
+    hub.subscribe("134860", "Tony Romo", "English")
+    hub.poll_once()
+    hindi = hub.subscribe("134860", "Tony Romo", "Hindi")
+    hub.poll_once({"134860"}, use_cached=True)
+
+    assert upstream.fetches == 1
+    assert upstream.generations == 2
+    assert hindi.next_event(0)["language"] == "Hindi"
+    assert format_sse({"version": 7, "text": "hi"}).startswith("id: 7\nevent: commentary\n")
+
+    print("✅ Live feed cached games tests passed!")
+
+def test_idle_feeds_are_pruned():
+    """Test that cached events and games are dropped once a feed has been idle past the grace period."""
+    print("Testing live feed pruning...")
+
+    upstream = FakeUpstream()
+    hub = LiveFeedHub(upstream.fetch_scores, upstream.commentate, poll_interval=3600, idle_grace=0.05)
+    hub._ensure_poller = lambda: None
+
+    english = hub.subscribe("134860", "Tony Romo", "English")
+    hindi = hub.subscribe("134860", "Tony Romo", "Hindi")
+    hub.poll_once()
+    assert len(hub.cached_keys()) == 2
+
+    # A returning watcher within the grace period reuses the cached event
+    hub.unsubscribe(english)
+    hub.poll_once()
+    assert ("134860", "Tony Romo", "English") in hub.cached_keys()
+    english = hub.subscribe("134860", "Tony Romo", "English")
+    assert english.next_event(0)["version"] == 1
+
+    hub.unsubscribe(english)
+    time.sleep(0.06)
+    hub.poll_once()
+    assert hub.cached_keys() == {("134860", "Tony Romo", "Hindi")}
+    assert "134860" in hub._games
+
+    hub.unsubscribe(hindi)
+    time.sleep(0.06)
+    hub.poll_once()
+    assert hub.cached_keys() == set()
+    assert hub._games == {}
+
+    print("✅ Live feed pruning tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running Live Feed Tests...\n")
+
+    try:
+        test_fan_out_shares_poll_and_generation()
+        test_new_language_reuses_cached_games()
+        test_idle_feeds_are_pruned()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
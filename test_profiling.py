@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the profiling module.
+Run with: python test_profiling.py
+"""
+
+import sys
+import os
+import importlib
+import threading
+import time
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from types import SimpleNamespace
+from flask import Flask
+import app as app_module
+from config import Config
+from profiling import ProfileStore, StackSampler, profiling_requested
+
+def build_app(profiling_enabled):
+    """Re-create the app module's Flask app with profiling on or off."""
+    original = Config.PROFILING_ENABLED
+    Config.PROFILING_ENABLED = profiling_enabled
+    try:
+        return importlib.reload(app_module).app
+    finally:
+        Config.PROFILING_ENABLED = original
+
+def test_profiling_requested():
+    """Test the header and query flags, which only count with the admin token."""
+    print("Testing profiling flag...")
+
+    app = Flask(__name__)
+    admin = {"X-Admin-Token": "secret"}
+    original = Config.ADMIN_TOKEN
+    Config.ADMIN_TOKEN = "secret"
+    try:
+        with app.test_request_context("/commentary?profile=1", headers=admin):
+            assert profiling_requested() == True
+        with app.test_request_context("/commentary", headers={"X-Profile": "true", **admin}):
+            assert profiling_requested() == True
+        with app.test_request_context("/commentary?profile=0", headers=admin):
+            assert profiling_requested() == False
+        with app.test_request_context("/commentary", headers=admin):
+            assert profiling_requested() == False
+        with app.test_request_context("/commentary?profile=1"):
+            assert profiling_requested() == False
+        with app.test_request_context("/commentary?profile=1", headers={"X-Admin-Token": "wrong"}):
+            assert profiling_requested() == False
+
+        Config.ADMIN_TOKEN = ""
+        with app.test_request_context("/commentary?profile=1", headers={"X-Admin-Token": ""}):
+            assert profiling_requested() == False
+    finally:
+        Config.ADMIN_TOKEN = original
+
+    print("✅ Profiling flag tests passed!")
+
+def test_profile_store_and_sampler():
+    """Test bounded profile storage and stack sampling of a registered thread."""
+    print("Testing profile store and sampler...")
+
+    app = Flask(__name__)
+    store = ProfileStore(max_profiles=2)
+    with app.test_request_context("/commentary?profile=1"):
+        first = store.add("cprofile", 12.34, "report 1")
+        store.add("cprofile", 5, "report 2")
+        last = store.add("sampled", 5, "report 3")
+
+    assert store.get(first) is None
+    assert store.get(last)["report"] == "report 3"
+    assert [p["id"] for p in store.summaries()][0] == last
+    assert "report" not in store.summaries()[0]
+    assert store.summaries()[1]["path"] == "/commentary?profile=1"
+
+    sampler = StackSampler(interval=0.001)
+    sampler._thread = threading.current_thread()  # sample by hand instead of in the background
+    sampler.start(threading.get_ident())
+    sampler.sample_once()
+    sampler.sample_once()
+    samples = sampler.stop(threading.get_ident())
+    assert sum(samples.values()) == 2
+    assert all("test_profiling.py:test_profile_store_and_sampler" in stack for stack in samples)
+    assert sampler.stop(threading.get_ident()) == {}
+
+    print("✅ Profile store and sampler tests passed!")
+
+def test_profiling_hooks():
+    """Test that ?profile=1 and slow requests are stored and admin endpoints need the token."""
+    print("Testing profiling hooks...")
+
+    original_slow_ms, original_token = Config.PROFILE_SLOW_REQUEST_MS, Config.ADMIN_TOKEN
+    original_endpoints = Config.PROFILE_SLOW_REQUEST_ENDPOINTS
+    Config.PROFILE_SLOW_REQUEST_MS = 30
+    Config.PROFILE_SLOW_REQUEST_ENDPOINTS = ["commentary", "slow"]
+    Config.ADMIN_TOKEN = "secret"
+    try:
+        app = build_app(profiling_enabled=True)
+
+        @app.route("/slow")
+        def slow():
+            time.sleep(0.08)
+            return "done"
+
+        client = app.test_client()
+        headers = {"X-Admin-Token": "secret"}
+
+        # Anonymous clients cannot ask for a cProfile run
+        assert "X-Profile-Id" not in client.get("/?profile=1").headers
+
+        response = client.get("/?profile=1", headers=headers)
+        profile_id = response.headers.get("X-Profile-Id")
+        assert profile_id
+
+        # Fast requests are sampled but not kept
+        assert "X-Profile-Id" not in client.get("/").headers
+        slow_id = client.get("/slow").headers.get("X-Profile-Id")
+        assert slow_id
+
+        # Long-polls wait by design and are never captured as slow requests
+        def wait_for_update(*args, **kwargs):
+            time.sleep(0.08)
+            return None
+        app_module.live_hub = SimpleNamespace(wait_for_update=wait_for_update)
+        long_poll = client.get("/teams/133602/live?mode=poll")
+        assert long_poll.status_code == 204
+        assert "X-Profile-Id" not in long_poll.headers
+
+        assert client.get("/admin/profiles").status_code == 404
+        profiles = client.get("/admin/profiles", headers=headers).get_json()["profiles"]
+        assert [p["kind"] for p in profiles] == ["sampled", "cprofile"]
+
+        report = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+        assert report.status_code == 200
+        assert "cumulative" in report.get_data(as_text=True)
+        assert client.get(f"/admin/profiles/{slow_id}", headers=headers).get_data(as_text=True).startswith("# ")
+    finally:
+        Config.PROFILE_SLOW_REQUEST_MS, Config.ADMIN_TOKEN = original_slow_ms, original_token
+        Config.PROFILE_SLOW_REQUEST_ENDPOINTS = original_endpoints
+        build_app(profiling_enabled=False)
+
+    print("✅ Profiling hook tests passed!")
+
+def test_profiling_disabled():
+    """Test that no hooks or admin routes are registered when profiling is off."""
+    print("Testing disabled profiling...")
+
+    app = build_app(profiling_enabled=False)
+    assert not app.before_request_funcs
+    assert not app.after_request_funcs
+    assert not app.teardown_request_funcs
+    assert "/admin/profiles" not in {rule.rule for rule in app.url_map.iter_rules()}
+    assert "X-Profile-Id" not in app.test_client().get("/?profile=1").headers
+
+    print("✅ Disabled profiling tests passed!")
+
+def test_admin_endpoints_need_token():
+    """Test that admin endpoints are hidden unless a token is configured and sent."""
+    print("Testing admin token...")
+
+    client = app_module.app.test_client()
+    original = Config.ADMIN_TOKEN
+    try:
+        Config.ADMIN_TOKEN = ""
+        assert client.get("/admin/token-usage").status_code == 404
+        assert client.get("/admin/token-usage", headers={"X-Admin-Token": ""}).status_code == 404
+
+        Config.ADMIN_TOKEN = "secret"
+        assert client.get("/admin/token-usage", headers={"X-Admin-Token": "wrong"}).status_code == 404
+        assert client.get("/admin/token-usage", headers={"X-Admin-Token": "secret"}).status_code == 200
+    finally:
+        Config.ADMIN_TOKEN = original
+
+    print("✅ Admin token tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running Profiling Tests...\n")
+
+    try:
+        test_profiling_requested()
+        test_profile_store_and_sampler()
+        test_profiling_hooks()
+        test_profiling_disabled()
+        test_admin_endpoints_need_token()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the prompts module.
+Run with: python test_prompts.py
+"""
+
+import sys
+import os
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from prompts import build_commentary_prompt, completion_tokens_needed, estimate_tokens, TokenUsageLog
+
+GAMES = [f"Liverpool vs Team {i} on 2024-05-{i:02d} - Score: 2:1" for i in range(1, 6)]
+
+def test_output_budget_follows_duration():
+    """Test that max_tokens grows with the target duration and stays within limits."""
+    print("Testing completion token budget...")
+
+    short = build_commentary_prompt(GAMES, "Tony Romo", ["English"], target_seconds=20)
+    long = build_commentary_prompt(GAMES, "Tony Romo", ["English"], target_seconds=120)
+    assert short.max_tokens < long.max_tokens
+    assert Config.MIN_COMPLETION_TOKENS <= short.max_tokens <= Config.MAX_COMPLETION_TOKENS
+    assert f"about {short.target_words} words" in short.text
+
+    # Wordier commentators get a bigger budget for the same duration
+    harsha = build_commentary_prompt(GAMES, "Harsha Bhogle", ["English"], target_seconds=60)
+    ravi = build_commentary_prompt(GAMES, "Ravi Shastri", ["English"], target_seconds=60)
+    assert harsha.max_tokens > ravi.max_tokens
+
+    # Each extra language needs its own share of the budget
+    multi = build_commentary_prompt(GAMES, "Tony Romo", ["English", "Spanish"], target_seconds=20)
+    assert multi.max_tokens > short.max_tokens
+    assert "JSON object" in multi.text
+
+    print("✅ Completion token budget tests passed!")
+
+def test_long_multilingual_fits_completion_limit():
+    """Test that the longest duration in every language is shortened to fit the token cap."""
+    print("Testing completion limit for long multilingual commentary...")
+
+    languages = list(Config.VOICE_SETTINGS)
+    for commentator in Config.COMMENTATORS:
+        prompt = build_commentary_prompt(GAMES, commentator, languages,
+                                         target_seconds=Config.MAX_TARGET_AUDIO_SECONDS)
+        needed = completion_tokens_needed(prompt.target_words, languages)
+        assert needed <= prompt.max_tokens <= Config.MAX_COMPLETION_TOKENS
+        assert prompt.target_seconds < Config.MAX_TARGET_AUDIO_SECONDS
+        assert f"about {prompt.target_words} words" in prompt.text
+        assert f"roughly {prompt.target_seconds} seconds" in prompt.text
+
+    # Requests that already fit are left alone
+    prompt = build_commentary_prompt(GAMES, "Tony Romo", ["English"], target_seconds=60)
+    assert prompt.target_seconds == 60
+
+    print("✅ Completion limit tests passed!")
+
+def test_input_budget_drops_games():
+    """Test that games are dropped until the prompt fits the input budget."""
+    print("Testing prompt token budget...")
+
+    many_games = [game + " " + "x" * 400 for game in GAMES * 4]
+    prompt = build_commentary_prompt(many_games, "Tony Romo", ["English"])
+    assert 1 <= len(prompt.games) < len(many_games)
+    assert prompt.estimated_prompt_tokens <= Config.MAX_PROMPT_TOKENS
+    assert prompt.games == many_games[:len(prompt.games)]
+
+    assert estimate_tokens("abcd" * 10) == 10
+
+    print("✅ Prompt token budget tests passed!")
+
+def test_token_usage_summary():
+    """Test token usage averages."""
+    print("Testing token usage log...")
+
+    log = TokenUsageLog()
+    assert log.summary() == {"requests": 0}
+    log.record({"prompt_tokens": 100, "completion_tokens": 200, "finish_reason": "stop"})
+    log.record({"prompt_tokens": 300, "completion_tokens": 400, "finish_reason": "length"})
+
+    summary = log.summary()
+    assert summary["requests"] == 2
+    assert summary["avg_prompt_tokens"] == 200
+    assert summary["avg_completion_tokens"] == 300
+    assert summary["truncated"] == 1
+
+    print("✅ Token usage log tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running Prompt Builder Tests...\n")
+
+    try:
+        test_output_budget_follows_duration()
+        test_long_multilingual_fits_completion_limit()
+        test_input_budget_drops_games()
+        test_token_usage_summary()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
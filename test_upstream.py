@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Basic tests for the upstream module.
+Run with: python test_upstream.py
+"""
+
+import sys
+import os
+import time
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from types import SimpleNamespace
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+import utils
+from config import Config
+import upstream
+from upstream import UpstreamClient, ResultCache
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class FakeSession:
+    """Replays a scripted sequence of responses or exceptions."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.timeouts = []
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        self.timeouts.append(kwargs["timeout"])
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            return FakeResponse(*outcome)
+        return FakeResponse(outcome)
+
+def refused_connection():
+    """The ConnectionError requests raises when nothing is listening."""
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+def make_client(outcomes, max_retries=3):
+    client = UpstreamClient(max_retries=max_retries, backoff_base=0, backoff_max=0)
+    session = FakeSession(outcomes)
+    client._sessions["api.example.com"] = session
+    return client, session
+
+def test_retries():
+    """Test that transient failures are retried and permanent ones are not."""
+    print("Testing upstream retries...")
+
+    client, session = make_client([requests.exceptions.ConnectionError("down"), 503, 200])
+    assert client.get("https://api.example.com/x").status_code == 200
+    assert session.calls == 3
+
+    client, session = make_client([404])
+    assert client.get("https://api.example.com/x").status_code == 404
+    assert session.calls == 1
+
+    client, session = make_client([503, 503], max_retries=1)
+    assert client.get("https://api.example.com/x").status_code == 503
+    assert session.calls == 2
+
+    client, session = make_client([requests.exceptions.Timeout("slow")] * 2, max_retries=1)
+    try:
+        client.get("https://api.example.com/x")
+        assert False, "Timeout should be raised after the last attempt"
+    except requests.exceptions.Timeout:
+        pass
+    assert session.calls == 2
+
+    print("✅ Upstream retry tests passed!")
+
+def test_backoff_delay():
+    """Test that backoff is jittered, bounded and honours Retry-After."""
+    print("Testing upstream backoff...")
+
+    client = UpstreamClient(backoff_base=0.5, backoff_max=4)
+    for attempt in range(6):
+        assert 0 <= client.backoff_delay(attempt) <= min(4, 0.5 * 2 ** attempt)
+    assert client.backoff_delay(0, "2") == 2
+    assert client.backoff_delay(0, "60") == 4
+
+    print("✅ Upstream backoff tests passed!")
+
+def test_post_retries():
+    """Test that POSTs are only retried when the server cannot have acted on them."""
+    print("Testing upstream POST retries...")
+
+    client, session = make_client([requests.exceptions.ReadTimeout("slow"), 200])
+    try:
+        client.post("https://api.example.com/tts")
+        assert False, "A read timeout on a POST should not be retried"
+    except requests.exceptions.ReadTimeout:
+        pass
+    assert session.calls == 1
+
+    client, session = make_client([500, 200])
+    assert client.post("https://api.example.com/tts").status_code == 500
+    assert session.calls == 1
+
+    client, session = make_client([refused_connection(), requests.exceptions.ConnectTimeout("slow"),
+                                   429, 503, 200], max_retries=4)
+    assert client.post("https://api.example.com/tts").status_code == 200
+    assert session.calls == 5
+
+    print("✅ Upstream POST retry tests passed!")
+
+def test_total_timeout():
+    """Test that retries stop once the total time budget would be exceeded."""
+    print("Testing upstream total timeout...")
+
+    client, session = make_client([(503, {"Retry-After": "5"}), 200])
+    client.backoff_max = 10
+    response = client.get("https://api.example.com/x", timeout=3, total_timeout=1)
+    assert response.status_code == 503
+    assert session.calls == 1
+    assert session.timeouts[0] <= 1
+
+    print("✅ Upstream total timeout tests passed!")
+
+def test_groq_client_limits():
+    """Test that the shared Groq client has a bounded timeout and few retries."""
+    print("Testing Groq client limits...")
+
+    original = upstream._groq_client
+    upstream._groq_client = None
+    try:
+        client = upstream.get_groq_client()
+        assert client.timeout == Config.GROQ_TIMEOUT
+        assert client.max_retries == Config.GROQ_MAX_RETRIES
+        assert upstream.get_groq_client() is client
+    finally:
+        upstream._groq_client = original
+
+    print("✅ Groq client limit tests passed!")
+
+def test_result_cache():
+    """Test failure marks expire, good results clear them and refreshes are single-flight."""
+    print("Testing result cache...")
+
+    cache = ResultCache(negative_ttl=0.05)
+    assert cache.lookup("134860") == (None, None)
+    cache.mark_failed("134860")
+    assert cache.is_failing("134860") == True
+    time.sleep(0.06)
+    assert cache.is_failing("134860") == False
+
+    cache.mark_failed("134860")
+    cache.store_good("134860", ["game"])
+    assert cache.is_failing("134860") == False
+    value, age = cache.lookup("134860")
+    assert value == ["game"] and 0 <= age < 1
+
+    assert cache.begin_refresh("134860") == True
+    assert cache.begin_refresh("134860") == False
+    cache.end_refresh("134860")
+    assert cache.begin_refresh("134860") == True
+
+    print("✅ Result cache tests passed!")
+
+class ScoresUpstream:
+    """Stands in for fetch_recent_scores and the refresh executor."""
+
+    def __init__(self):
+        self.calls = []
+        self.result = ["Liverpool vs Arsenal on 2024-05-01 - Score: 2:1"]
+
+    def fetch(self, team_id):
+        self.calls.append(team_id)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return list(self.result)
+
+def patch_scores(fresh_ttl, stale_ttl):
+    """Swap in a fake upstream, an empty cache and an inline refresh executor."""
+    fake = ScoresUpstream()
+    originals = (utils.fetch_recent_scores, utils.scores_cache, utils._scores_refresh_executor,
+                 Config.SCORES_FRESH_TTL, Config.SCORES_STALE_TTL)
+    utils.fetch_recent_scores = fake.fetch
+    utils.scores_cache = ResultCache(negative_ttl=60)
+    utils._scores_refresh_executor = SimpleNamespace(submit=lambda fn: fn())
+    Config.SCORES_FRESH_TTL, Config.SCORES_STALE_TTL = fresh_ttl, stale_ttl
+    return fake, originals
+
+def restore_scores(originals):
+    (utils.fetch_recent_scores, utils.scores_cache, utils._scores_refresh_executor,
+     Config.SCORES_FRESH_TTL, Config.SCORES_STALE_TTL) = originals
+
+def test_scores_stale_while_revalidate():
+    """Test that fresh scores skip the upstream and stale ones are served while refreshing."""
+    print("Testing stale-while-revalidate scores...")
+
+    fake, originals = patch_scores(fresh_ttl=60, stale_ttl=600)
+    try:
+        first = utils.get_recent_scores("133602")
+        assert utils.get_recent_scores("133602") == first
+        assert fake.calls == ["133602"]
+
+        # Past the fresh TTL the cached scores are returned and refreshed behind the scenes
+        Config.SCORES_FRESH_TTL = 0
+        fake.result = ["Liverpool vs Chelsea on 2024-05-08 - Score: 1:1"]
+        assert utils.get_recent_scores("133602") == first
+        assert fake.calls == ["133602", "133602"]
+        assert utils.scores_cache.last_good("133602") == fake.result
+
+        # The live feed always asks the upstream
+        assert utils.refresh_recent_scores("133602") == fake.result
+        assert len(fake.calls) == 3
+    finally:
+        restore_scores(originals)
+
+    print("✅ Stale-while-revalidate tests passed!")
+
+def test_scores_served_stale_when_upstream_fails():
+    """Test that failed or empty fetches serve the last good scores and skip the upstream."""
+    print("Testing stale scores fallback...")
+
+    fake, originals = patch_scores(fresh_ttl=0, stale_ttl=0)
+    try:
+        good = utils.get_recent_scores("133602")
+        assert good
+
+        fake.result = requests.exceptions.ConnectionError("down")
+        assert utils.get_recent_scores("133602") == good
+        assert utils.get_recent_scores("133602") == good
+        assert utils.get_recent_scores("999999") == []
+        assert utils.get_recent_scores("999999") == []
+
+        # One upstream call per team while it is marked as failing
+        assert fake.calls == ["133602", "133602", "999999"]
+
+        # An empty response also keeps serving the last good scores
+        utils.scores_cache = ResultCache(negative_ttl=60)
+        fake.result = ["Liverpool vs Arsenal on 2024-05-01 - Score: 2:1"]
+        good = utils.get_recent_scores("133602")
+        fake.result = []
+        assert utils.get_recent_scores("133602") == good
+        assert utils.get_recent_scores("133602") == good
+        assert fake.calls[-2:] == ["133602", "133602"]
+        assert utils.get_recent_scores("888888") == []
+    finally:
+        restore_scores(originals)
+
+    print("✅ Stale scores fallback tests passed!")
+
+def run_all_tests():
+    """Run all tests."""
+    print("🧪 Running Upstream Client Tests...\n")
+
+    try:
+        test_retries()
+        test_post_retries()
+        test_total_timeout()
+        test_backoff_delay()
+        test_groq_client_limits()
+        test_result_cache()
+        test_scores_stale_while_revalidate()
+        test_scores_served_stale_when_upstream_fails()
+
+        print("\n🎉 All tests passed successfully!")
+        return True
+
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -6,17 +6,35 @@ Run with: python test_utils.py
 
 import sys
 import os
+from types import SimpleNamespace
 
 # Add the current directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import utils
 from utils import (
     validate_team_id,
     validate_commentator,
     validate_language,
-    get_team_name
+    validate_target_seconds,
+    get_team_name,
+    generate_multilingual_commentary_from_games,
+    text_to_speech_many
 )
 
+GAMES = ["Liverpool vs Arsenal on 2024-05-01 - Score: 2:1"]
+FALLBACK = "Liverpool vs Arsenal on 2024-05-01 - Score: 2:1. What a thrilling match!"
+
+def fake_groq_client(content):
+    """A stand-in Groq client whose completions always return `content`."""
+    def create(**kwargs):
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=50)
+        )
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
 def test_validate_team_id():
     """Test team ID validation."""
     print("Testing team ID validation...")
@@ -66,6 +84,24 @@ def test_validate_language():
     
     print("✅ Language validation tests passed!")
 
+def test_validate_target_seconds():
+    """Test commentary duration validation."""
+    print("Testing duration validation...")
+    
+    # Valid durations
+    assert validate_target_seconds(None) == True
+    assert validate_target_seconds(10) == True
+    assert validate_target_seconds(60) == True
+    assert validate_target_seconds(180) == True
+    
+    # Invalid durations
+    assert validate_target_seconds(5) == False
+    assert validate_target_seconds(600) == False
+    assert validate_target_seconds("60") == False
+    assert validate_target_seconds(True) == False
+    
+    print("✅ Duration validation tests passed!")
+
 def test_get_team_name():
     """Test team name retrieval."""
     print("Testing team name retrieval...")
@@ -80,6 +116,41 @@ def test_get_team_name():
     
     print("✅ Team name retrieval tests passed!")
 
+def test_multilingual_commentary_fallbacks():
+    """Test that only languages missing from the model response fall back."""
+    print("Testing multilingual commentary fallbacks...")
+    
+    original_client = utils.get_groq_client
+    try:
+        utils.get_groq_client = lambda: fake_groq_client('{"English": "Great game!", "Hindi": "  "}')
+        commentary = generate_multilingual_commentary_from_games(
+            GAMES, "Tony Romo", ["English", "Hindi", "Spanish"])
+        assert commentary == {"English": "Great game!", "Hindi": FALLBACK, "Spanish": FALLBACK}
+        
+        # Invalid JSON falls back for every language
+        utils.get_groq_client = lambda: fake_groq_client("Great game! {not json")
+        commentary = generate_multilingual_commentary_from_games(GAMES, "Tony Romo", ["English", "Spanish"])
+        assert commentary == {"English": FALLBACK, "Spanish": FALLBACK}
+    finally:
+        utils.get_groq_client = original_client
+    
+    print("✅ Multilingual commentary fallback tests passed!")
+
+def test_text_to_speech_many():
+    """Test that one failed language does not affect the others."""
+    print("Testing parallel text to speech...")
+    
+    original_tts = utils.text_to_speech
+    try:
+        utils.text_to_speech = lambda text, language: None if language == "Hindi" else f"static/{language}.mp3"
+        audio = text_to_speech_many({"English": "a", "Hindi": "b", "Spanish": "c"})
+        assert audio == {"English": "static/English.mp3", "Hindi": None, "Spanish": "static/Spanish.mp3"}
+        assert text_to_speech_many({}) == {}
+    finally:
+        utils.text_to_speech = original_tts
+    
+    print("✅ Parallel text to speech tests passed!")
+
 def run_all_tests():
     """Run all tests."""
     print("🧪 Running AI Sports Commentator Tests...\n")
@@ -88,7 +159,10 @@ def run_all_tests():
         test_validate_team_id()
         test_validate_commentator()
         test_validate_language()
+        test_validate_target_seconds()
         test_get_team_name()
+        test_multilingual_commentary_fallbacks()
+        test_text_to_speech_many()
         
         print("\n🎉 All tests passed successfully!")
         return True
@@ -0,0 +1,217 @@
+"""
+Upstream Client
+Shared HTTP access to external APIs with per-host connection pools, retries and failure caching
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from groq import Groq
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Statuses that mean a non-idempotent request was not acted on, so retrying cannot repeat it
+NON_IDEMPOTENT_RETRYABLE_STATUSES = {429, 503}
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+def is_connect_failure(error: requests.exceptions.RequestException) -> bool:
+    """True if the request never reached the server, e.g. a refused connection or DNS failure."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.Timeout):
+        return False
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class UpstreamClient:
+    """
+    HTTP client with one pooled session per host and jittered exponential-backoff retries.
+
+    Idempotent requests are retried on connection errors, timeouts and
+    retryable statuses. Other requests (such as paid TTS POSTs) are only
+    retried when the server cannot have acted on them: failed connections,
+    429 and 503. Retries stop after `max_retries` or once the next attempt
+    would pass the total time budget; the last exception is then raised, or
+    the last response returned, exactly as `requests` would.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, pool_size: Optional[int] = None):
+        self.max_retries = Config.UPSTREAM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.UPSTREAM_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.UPSTREAM_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.pool_size = pool_size or Config.UPSTREAM_POOL_SIZE
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None,
+                total_timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's pooled session, retrying transient failures.
+
+        Args:
+            method: The HTTP method
+            url: The URL to request
+            timeout: Seconds allowed per attempt, defaults to Config.UPSTREAM_TIMEOUT
+            total_timeout: Seconds allowed across all attempts and backoff,
+                defaults to Config.UPSTREAM_TOTAL_TIMEOUT
+            **kwargs: Passed on to requests
+        """
+        timeout = Config.UPSTREAM_TIMEOUT if timeout is None else timeout
+        total_timeout = Config.UPSTREAM_TOTAL_TIMEOUT if total_timeout is None else total_timeout
+        deadline = time.monotonic() + total_timeout
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRYABLE_STATUSES if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUSES
+        host = urlsplit(url).netloc
+        session = self._session_for(url)
+
+        attempt = 0
+        while True:
+            remaining = max(deadline - time.monotonic(), 0.001)
+            response, error = None, None
+            try:
+                response = session.request(method, url, timeout=min(timeout, remaining), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not (idempotent or is_connect_failure(e)):
+                    raise
+                error = e
+            else:
+                if response.status_code not in retry_statuses:
+                    return response
+
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            delay = self.backoff_delay(attempt, retry_after)
+            if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                if error is not None:
+                    raise error
+                return response
+
+            reason = error if error is not None else f"status {response.status_code}"
+            logger.warning(f"{method} {host} failed ({reason}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _session_for(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+class ResultCache:
+    """
+    Remembers the last good result per key, its age, and short-lived failures.
+
+    Callers use the age to serve fresh results straight from the cache and
+    older ones while a single background refresh runs. While a key is marked
+    as failing, they skip the upstream and serve the last good result instead.
+    """
+
+    def __init__(self, negative_ttl: Optional[float] = None, max_entries: int = 500):
+        self.negative_ttl = Config.UPSTREAM_NEGATIVE_CACHE_TTL if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._good: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._failed_until: Dict[str, float] = {}
+        self._refreshing: Set[str] = set()
+
+    def last_good(self, key: str) -> Optional[Any]:
+        value, _ = self.lookup(key)
+        return value
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """The last good result for `key` and its age in seconds, or (None, None)."""
+        with self._lock:
+            entry = self._good.get(key)
+            if entry is None:
+                return None, None
+            self._good.move_to_end(key)
+            value, stored_at = entry
+            return value, time.monotonic() - stored_at
+
+    def store_good(self, key: str, value: Any):
+        """Record a successful result, clearing any failure mark."""
+        with self._lock:
+            self._good[key] = (value, time.monotonic())
+            self._good.move_to_end(key)
+            while len(self._good) > self.max_entries:
+                self._good.popitem(last=False)
+            self._failed_until.pop(key, None)
+
+    def mark_failed(self, key: str):
+        """Skip the upstream for this key for `negative_ttl` seconds."""
+        with self._lock:
+            now = time.monotonic()
+            # Drop expired marks so failures for many keys cannot accumulate
+            for expired in [k for k, until in self._failed_until.items() if until <= now]:
+                del self._failed_until[expired]
+            self._failed_until[key] = now + self.negative_ttl
+
+    def is_failing(self, key: str) -> bool:
+        with self._lock:
+            until = self._failed_until.get(key)
+            return until is not None and until > time.monotonic()
+
+    def begin_refresh(self, key: str) -> bool:
+        """Claim the background refresh for `key`; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: str):
+        with self._lock:
+            self._refreshing.discard(key)
+
+# Shared instances used by utils and voice_utils
+upstream = UpstreamClient()
+scores_cache = ResultCache()
+
+_groq_client: Optional[Groq] = None
+_groq_lock = threading.Lock()
+
+def get_groq_client() -> Groq:
+    """
+    Shared Groq client, so completions reuse its connection pool.
+
+    The SDK retries any timeout, even on completion POSTs, so attempts are
+    capped by Config.GROQ_TIMEOUT and kept few; a stuck completion would
+    otherwise block /commentary and the live feed poller for minutes.
+    """
+    global _groq_client
+    with _groq_lock:
+        if _groq_client is None:
+            _groq_client = Groq(api_key=Config.GROQ_API_KEY, timeout=Config.GROQ_TIMEOUT,
+                                max_retries=Config.GROQ_MAX_RETRIES)
+        return _groq_client
@@ -1,13 +1,22 @@
+import io
+import json
 import os
 import time
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import requests
-from groq import Groq
 from gtts import gTTS
 from config import Config
+from audio_store import save_audio
+from prompts import CommentaryPrompt, build_commentary_prompt, token_usage
+from upstream import get_groq_client, scores_cache, upstream
+
+# Shared workers for background scores refreshes
+_scores_refresh_executor = ThreadPoolExecutor(max_workers=Config.SCORES_REFRESH_WORKERS,
+                                              thread_name_prefix="scores-refresh")
 
 # Configure logging
 logging.basicConfig(
@@ -71,6 +80,12 @@ def get_recent_scores(team_id: str) -> List[str]:
     """
     Fetches recent game scores for a given team ID from TheSportsDB API.
     
+    Scores fetched within Config.SCORES_FRESH_TTL seconds are served from the
+    cache. Older scores, up to Config.SCORES_STALE_TTL, are served immediately
+    while a background refresh updates them. Failed and empty fetches are not
+    repeated for Config.UPSTREAM_NEGATIVE_CACHE_TTL seconds, and while
+    TheSportsDB is failing the last good scores are served.
+    
     Args:
         team_id: The team ID to fetch scores for
         
@@ -81,43 +96,162 @@ def get_recent_scores(team_id: str) -> List[str]:
         logger.error(f"Invalid team ID: {team_id}")
         return []
     
-    url = f"{Config.SPORTS_API_BASE_URL}/{Config.SPORTS_API_KEY}/eventslast.php?id={team_id}"
+    games, age = scores_cache.lookup(team_id)
+    if games and age < Config.SCORES_FRESH_TTL:
+        return list(games)
     
-    try:
-        logger.info(f"Fetching scores for team ID: {team_id}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        events = data.get('results', [])
-        
-        if not events:
-            logger.warning(f"No events found for team ID: {team_id}")
-            return []
-        
-        summary = []
-        for event in events[:5]:  # Limit to 5 most recent games
-            try:
-                event_str = f"{event['strEvent']} on {event['dateEvent']} - Score: {event['intHomeScore']}:{event['intAwayScore']}"
-                summary.append(event_str)
-            except KeyError as e:
-                logger.warning(f"Missing key in event data: {e}")
-                continue
-        
-        logger.info(f"Successfully fetched {len(summary)} games for team ID: {team_id}")
-        return summary
+    if scores_cache.is_failing(team_id):
+        logger.info(f"Skipping scores fetch for team {team_id} after a recent failure")
+        return last_good_scores(team_id)
+    
+    if games and age < Config.SCORES_STALE_TTL:
+        refresh_scores_in_background(team_id)
+        return list(games)
+    
+    return refresh_recent_scores(team_id)
+
+def refresh_recent_scores(team_id: str) -> List[str]:
+    """
+    Fetches recent game scores from TheSportsDB and updates the scores cache.
+    
+    Unlike get_recent_scores this always asks the upstream, unless the team is
+    marked as failing. Use it where results must be current, such as the live feed.
+    
+    Args:
+        team_id: The team ID to fetch scores for
         
+    Returns:
+        List[str]: List of game summaries, or the last good ones if the fetch failed
+    """
+    if not validate_team_id(team_id):
+        logger.error(f"Invalid team ID: {team_id}")
+        return []
+    
+    if scores_cache.is_failing(team_id):
+        return last_good_scores(team_id)
+    
+    try:
+        summary = fetch_recent_scores(team_id)
     except requests.exceptions.RequestException as e:
         logger.error(f"Request error fetching scores for team {team_id}: {e}")
-        return []
+        scores_cache.mark_failed(team_id)
+        return last_good_scores(team_id)
     except ValueError as e:
         logger.error(f"JSON parsing error for team {team_id}: {e}")
-        return []
+        scores_cache.mark_failed(team_id)
+        return last_good_scores(team_id)
     except Exception as e:
         logger.error(f"Unexpected error fetching scores for team {team_id}: {e}")
+        scores_cache.mark_failed(team_id)
+        return last_good_scores(team_id)
+    
+    if not summary:
+        # Unknown team IDs come back empty, and so does TheSportsDB under load
+        # ("results": null); don't ask again straight away and keep serving
+        # the last good scores, if any
+        scores_cache.mark_failed(team_id)
+        return last_good_scores(team_id)
+    
+    scores_cache.store_good(team_id, summary)
+    return summary
+
+def refresh_scores_in_background(team_id: str):
+    """
+    Starts a background refresh of a team's scores, unless one is already running.
+    
+    Args:
+        team_id: The team ID to refresh
+    """
+    if not scores_cache.begin_refresh(team_id):
+        return
+    
+    def refresh():
+        try:
+            refresh_recent_scores(team_id)
+        finally:
+            scores_cache.end_refresh(team_id)
+    
+    try:
+        _scores_refresh_executor.submit(refresh)
+    except RuntimeError as e:
+        scores_cache.end_refresh(team_id)
+        logger.error(f"Could not schedule scores refresh for team {team_id}: {e}")
+
+def fetch_recent_scores(team_id: str) -> List[str]:
+    """
+    Fetches recent game scores from TheSportsDB without any caching.
+    
+    Args:
+        team_id: The team ID to fetch scores for
+        
+    Returns:
+        List[str]: List of game summaries, empty if the team has no events
+        
+    Raises:
+        requests.exceptions.RequestException: If the request fails
+        ValueError: If the response is not valid JSON
+    """
+    url = f"{Config.SPORTS_API_BASE_URL}/{Config.SPORTS_API_KEY}/eventslast.php?id={team_id}"
+    
+    logger.info(f"Fetching scores for team ID: {team_id}")
+    response = upstream.get(url)
+    response.raise_for_status()
+    
+    data = response.json()
+    events = data.get('results', [])
+    
+    if not events:
+        logger.warning(f"No events found for team ID: {team_id}")
         return []
+    
+    summary = []
+    for event in events[:5]:  # Limit to 5 most recent games
+        try:
+            event_str = f"{event['strEvent']} on {event['dateEvent']} - Score: {event['intHomeScore']}:{event['intAwayScore']}"
+            summary.append(event_str)
+        except KeyError as e:
+            logger.warning(f"Missing key in event data: {e}")
+            continue
+    
+    logger.info(f"Successfully fetched {len(summary)} games for team ID: {team_id}")
+    return summary
+
+def last_good_scores(team_id: str) -> List[str]:
+    """
+    Returns the last successfully fetched scores for a team, if any.
+    
+    Args:
+        team_id: The team ID
+        
+    Returns:
+        List[str]: List of game summaries, or an empty list
+    """
+    games = scores_cache.last_good(team_id)
+    if games:
+        logger.warning(f"Serving last good scores for team {team_id}")
+        return list(games)
+    return []
+
+def validate_target_seconds(target_seconds: Optional[int]) -> bool:
+    """
+    Validate the requested commentary duration.
+    
+    Args:
+        target_seconds: Desired spoken length in seconds, or None for the default
+        
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    if target_seconds is None:
+        return True
+    
+    if not isinstance(target_seconds, int) or isinstance(target_seconds, bool):
+        return False
+    
+    return Config.MIN_TARGET_AUDIO_SECONDS <= target_seconds <= Config.MAX_TARGET_AUDIO_SECONDS
 
-def generate_commentary(team_id: str, commentator: str, language: str) -> str:
+def generate_commentary(team_id: str, commentator: str, language: str,
+                        target_seconds: Optional[int] = None) -> str:
     """
     Generates sports commentary based on a team's recent games.
     
@@ -125,6 +259,7 @@ def generate_commentary(team_id: str, commentator: str, language: str) -> str:
         team_id: The team ID
         commentator: The commentator personality
         language: The language for commentary
+        target_seconds: Desired spoken length, defaults to Config.TARGET_AUDIO_SECONDS
         
     Returns:
         str: Generated commentary text
@@ -139,30 +274,35 @@ def generate_commentary(team_id: str, commentator: str, language: str) -> str:
     if not validate_language(language):
         raise ValidationError("Invalid language")
     
+    if not validate_target_seconds(target_seconds):
+        raise ValidationError("Invalid duration")
+    
     games = get_recent_scores(team_id)
     if not games:
         return "No recent games found for this team."
 
-    prompt = f"""
-You are {commentator}, {Config.COMMENTATORS[commentator]}.
-Here are the recent games:
-{chr(10).join(games)}
+    return generate_commentary_from_games(games, commentator, language, team_id, target_seconds)
 
-Please generate a unique, lively, and engaging commentary for each game in {language}.
-Avoid starting with "You are {commentator}".
-End each game commentary naturally, make it exciting.
-"""
+def generate_commentary_from_games(games: List[str], commentator: str, language: str,
+                                   team_id: str = "", target_seconds: Optional[int] = None) -> str:
+    """
+    Generates commentary for game summaries that have already been fetched.
+    
+    Args:
+        games: Game summaries as returned by get_recent_scores
+        commentator: The commentator personality
+        language: The language for commentary
+        team_id: The team ID, used for logging only
+        target_seconds: Desired spoken length, defaults to Config.TARGET_AUDIO_SECONDS
+        
+    Returns:
+        str: Generated commentary text
+    """
+    prompt = build_commentary_prompt(games, commentator, [language], target_seconds)
     
     try:
         logger.info(f"Generating commentary for team {team_id} with {commentator} in {language}")
-        client = Groq(api_key=Config.GROQ_API_KEY)
-        
-        response = client.chat.completions.create(
-            model=Config.GROQ_MODEL,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        commentary_text = response.choices[0].message.content.strip()
+        commentary_text = request_completion(prompt, team_id, commentator, [language]).strip()
         logger.info(f"Successfully generated commentary for team {team_id}")
         return commentary_text
         
@@ -171,37 +311,187 @@ End each game commentary naturally, make it exciting.
         # Fallback simple static commentary
         return "\n".join([f"{game}. What a thrilling match!" for game in games])
 
+def generate_multilingual_commentary(team_id: str, commentator: str, languages: List[str],
+                                     target_seconds: Optional[int] = None) -> Dict[str, str]:
+    """
+    Generates commentary in several languages from a single scores fetch.
+    
+    Args:
+        team_id: The team ID
+        commentator: The commentator personality
+        languages: The languages for commentary
+        target_seconds: Desired spoken length, defaults to Config.TARGET_AUDIO_SECONDS
+        
+    Returns:
+        Dict[str, str]: Commentary text keyed by language
+    """
+    if not validate_team_id(team_id):
+        raise ValidationError("Invalid team ID")
+    
+    if not validate_commentator(commentator):
+        raise ValidationError("Invalid commentator")
+    
+    if not languages:
+        raise ValidationError("At least one language is required")
+    
+    for language in languages:
+        if not validate_language(language):
+            raise ValidationError(f"Invalid language: {language}")
+    
+    if not validate_target_seconds(target_seconds):
+        raise ValidationError("Invalid duration")
+    
+    games = get_recent_scores(team_id)
+    if not games:
+        return {language: "No recent games found for this team." for language in languages}
+    
+    return generate_multilingual_commentary_from_games(games, commentator, languages, team_id,
+                                                       target_seconds)
+
+def generate_multilingual_commentary_from_games(games: List[str], commentator: str,
+                                                languages: List[str], team_id: str = "",
+                                                target_seconds: Optional[int] = None) -> Dict[str, str]:
+    """
+    Generates commentary in several languages with one structured LLM completion.
+    
+    Args:
+        games: Game summaries as returned by get_recent_scores
+        commentator: The commentator personality
+        languages: The languages for commentary
+        team_id: The team ID, used for logging only
+        target_seconds: Desired spoken length, defaults to Config.TARGET_AUDIO_SECONDS
+        
+    Returns:
+        Dict[str, str]: Commentary text keyed by language
+    """
+    if len(languages) == 1:
+        return {languages[0]: generate_commentary_from_games(games, commentator, languages[0],
+                                                             team_id, target_seconds)}
+    
+    prompt = build_commentary_prompt(games, commentator, languages, target_seconds)
+    fallback = "\n".join([f"{game}. What a thrilling match!" for game in games])
+    
+    try:
+        logger.info(f"Generating commentary for team {team_id} with {commentator} in {', '.join(languages)}")
+        content = request_completion(prompt, team_id, commentator, languages,
+                                     response_format={"type": "json_object"})
+        
+        variants = json.loads(content)
+        commentary = {}
+        for language in languages:
+            text = variants.get(language)
+            if isinstance(text, str) and text.strip():
+                commentary[language] = text.strip()
+            else:
+                logger.warning(f"LLM response missing {language} commentary for team {team_id}")
+                commentary[language] = fallback
+        
+        logger.info(f"Successfully generated multilingual commentary for team {team_id}")
+        return commentary
+        
+    except Exception as e:
+        logger.error(f"LLM error generating multilingual commentary: {e}")
+        # Fallback simple static commentary
+        return {language: fallback for language in languages}
+
+def request_completion(prompt: CommentaryPrompt, team_id: str, commentator: str,
+                       languages: List[str], **kwargs) -> str:
+    """
+    Sends a budgeted prompt to Groq and records its token usage.
+    
+    Args:
+        prompt: The prompt built by build_commentary_prompt
+        team_id: The team ID, used for usage records
+        commentator: The commentator personality, used for usage records
+        languages: The languages requested, used for usage records
+        **kwargs: Extra arguments for the completion call
+        
+    Returns:
+        str: The completion text
+    """
+    client = get_groq_client()
+    
+    started = time.perf_counter()
+    response = client.chat.completions.create(
+        model=Config.GROQ_MODEL,
+        messages=[{"role": "user", "content": prompt.text}],
+        max_tokens=prompt.max_tokens,
+        temperature=Config.GROQ_TEMPERATURE,
+        **kwargs
+    )
+    latency_ms = (time.perf_counter() - started) * 1000
+    
+    usage = getattr(response, "usage", None)
+    finish_reason = response.choices[0].finish_reason
+    entry = {
+        "team_id": team_id,
+        "commentator": commentator,
+        "languages": languages,
+        "games": len(prompt.games),
+        "target_seconds": prompt.target_seconds,
+        "max_tokens": prompt.max_tokens,
+        "estimated_prompt_tokens": prompt.estimated_prompt_tokens,
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "finish_reason": finish_reason,
+        "latency_ms": round(latency_ms, 1)
+    }
+    token_usage.record(entry)
+    logger.info(f"Token usage for team {team_id}: prompt={entry['prompt_tokens']} "
+                f"completion={entry['completion_tokens']} max={prompt.max_tokens} "
+                f"latency={entry['latency_ms']}ms")
+    
+    if finish_reason == "length":
+        logger.warning(f"Commentary for team {team_id} hit the {prompt.max_tokens} token limit")
+    
+    return response.choices[0].message.content
+
 def text_to_speech(text: str, language: str = "English") -> Optional[str]:
     """
-    Converts text to speech and saves as MP3 file.
+    Converts text to speech and saves it as MP3 audio.
     
     Args:
         text: The text to convert
         language: The language for speech synthesis
         
     Returns:
-        Optional[str]: Path to the audio file, or None if failed
+        Optional[str]: Path the audio is served from, or None if failed
     """
     if not validate_language(language):
         logger.error(f"Invalid language: {language}")
         return None
     
     try:
-        timestamp = int(time.time() * 1000)
-        filename = f"{Config.STATIC_FOLDER}/commentary_{timestamp}.mp3"
-        
         logger.info(f"Converting text to speech in {language}")
         
         tts = gTTS(text=text, **Config.VOICE_SETTINGS[language])
-        tts.save(filename)
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
         
-        logger.info(f"Audio file saved: {filename}")
-        return filename
+        return save_audio(buffer.getvalue())
         
     except Exception as e:
         logger.error(f"Text-to-speech error: {e}")
         return None
 
+def text_to_speech_many(texts: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """
+    Converts several texts to speech in parallel.
+    
+    Args:
+        texts: Text to convert keyed by language
+        
+    Returns:
+        Dict[str, Optional[str]]: Audio path keyed by language, None where conversion failed
+    """
+    if not texts:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+        futures = {language: executor.submit(text_to_speech, text, language)
+                   for language, text in texts.items()}
+        return {language: future.result() for language, future in futures.items()}
+
 def cleanup_old_audio_files():
     """
     Clean up old audio files to prevent disk space issues.
@@ -3,11 +3,12 @@ Advanced Voice Generation Utilities
 Supports different voices for different commentators
 """
 
-import requests
-import time
+import io
 import os
 from typing import Optional
 from config import Config
+from audio_store import save_audio
+from upstream import upstream
 
 class VoiceGenerator:
     """Handles voice generation with different commentator personalities."""
@@ -91,15 +92,12 @@ class VoiceGenerator:
         }
         
         try:
-            response = requests.post(url, json=data, headers=headers)
+            # Synthesis is billed per request: allow long clips, and only retry
+            # failures where ElevenLabs cannot have started synthesizing
+            response = upstream.post(url, json=data, headers=headers,
+                                     timeout=Config.TTS_TIMEOUT, total_timeout=Config.TTS_TIMEOUT)
             if response.status_code == 200:
-                timestamp = int(time.time() * 1000)
-                filename = f"static/commentary_{timestamp}.mp3"
-                
-                with open(filename, "wb") as f:
-                    f.write(response.content)
-                
-                return filename
+                return save_audio(response.content)
         except Exception as e:
             print(f"ElevenLabs error: {e}")
             
@@ -122,19 +120,16 @@ class VoiceGenerator:
             )
             speech_config.speech_synthesis_voice_name = voice_name
             
-            timestamp = int(time.time() * 1000)
-            filename = f"static/commentary_{timestamp}.mp3"
-            
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=filename)
+            # No audio output config: the synthesized bytes are returned on the result
             synthesizer = speechsdk.SpeechSynthesizer(
                 speech_config=speech_config, 
-                audio_config=audio_config
+                audio_config=None
             )
             
             result = synthesizer.speak_text_async(text).get()
             
             if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                return filename
+                return save_audio(result.audio_data)
                 
         except Exception as e:
             print(f"Azure Speech error: {e}")
@@ -155,11 +150,10 @@ class VoiceGenerator:
             settings = voice_settings.get(language, {"lang": "en", "tld": "com"})
             tts = gTTS(text=text, lang=settings["lang"], tld=settings["tld"])
             
-            timestamp = int(time.time() * 1000)
-            filename = f"static/commentary_{timestamp}.mp3"
-            tts.save(filename)
+            buffer = io.BytesIO()
+            tts.write_to_fp(buffer)
             
-            return filename
+            return save_audio(buffer.getvalue())
             
         except Exception as e:
             print(f"gTTS fallback error: {e}")